@@ -10,21 +10,52 @@ Anthropic clients to the consuming code.
 
 import os
 import json
+import hashlib
+import pickle
+import tempfile
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
 from typing import Any, Dict, List, Union, Optional
 from dotenv import load_dotenv
 
-# Load environment variables
+# Load environment variables (once per process; the agents rely on this)
 load_dotenv()
 
+# Optional fast JSON for the adapter's per-turn (de)serialization
+try:
+    import orjson
+
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
 # =============================================================================
 # Data Structures (Mimic Anthropic SDK)
 # =============================================================================
 
 class ResponseWrapper:
     """Wrapper to make OpenAI responses look like Anthropic responses."""
-    def __init__(self, content, stop_reason):
+    def __init__(self, content, stop_reason, usage=None):
         self.content = content
         self.stop_reason = stop_reason
+        self.usage = usage
+
+class Usage:
+    """Token counts in Anthropic's shape, so prompt-cache hits read the same."""
+    def __init__(self, input_tokens=0, output_tokens=0, cache_read_input_tokens=0):
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.cache_read_input_tokens = cache_read_input_tokens
+        self.cache_creation_input_tokens = 0  # OpenAI caching has no write step
+
+    def __repr__(self):
+        attrs = ", ".join(f"{k}={v!r}" for k, v in self.__dict__.items())
+        return f"Usage({attrs})"
 
 class ContentBlock:
     """Wrapper to make content blocks look like Anthropic content blocks."""
@@ -57,6 +88,35 @@ class OpenAIAdapter:
     def __init__(self, openai_client):
         self.client = openai_client
         self.messages = self  # Duck typing: act as the 'messages' resource
+        self._tools_cache = {}  # id(tools) -> (tools, converted)
+
+    def _convert_tools(self, tools: List[Dict]) -> List[Dict]:
+        """
+        Convert Anthropic tool schemas to OpenAI function schemas.
+
+        Agents pass the same module-level tools list on every turn, so the
+        result is memoized per list object. The cache entry keeps a reference
+        to the list, which guarantees its id() is not reused by another one.
+        """
+        cached = self._tools_cache.get(id(tools))
+        if cached is not None and cached[0] is tools:
+            return cached[1]
+
+        openai_tools = []
+        for tool in tools:
+            openai_tools.append({
+                "type": "function",
+                "function": {
+                    "name": tool["name"],
+                    "description": tool["description"],
+                    "parameters": tool["input_schema"]
+                }
+            })
+
+        if len(self._tools_cache) >= 32:
+            self._tools_cache.clear()
+        self._tools_cache[id(tools)] = (tools, openai_tools)
+        return openai_tools
 
     def create(self, model: str, system: str, messages: List[Dict], tools: List[Dict], max_tokens: int = 8000):
         """
@@ -120,7 +180,7 @@ class OpenAIAdapter:
                                 "type": "function",
                                 "function": {
                                     "name": part_name,
-                                    "arguments": json.dumps(part_input)
+                                    "arguments": _json_dumps(part_input)
                                 }
                             })
                     
@@ -132,17 +192,8 @@ class OpenAIAdapter:
                     
                     openai_messages.append(assistant_msg)
 
-        # 2. Convert Tools (Anthropic -> OpenAI)
-        openai_tools = []
-        for tool in tools:
-            openai_tools.append({
-                "type": "function",
-                "function": {
-                    "name": tool["name"],
-                    "description": tool["description"],
-                    "parameters": tool["input_schema"]
-                }
-            })
+        # 2. Convert Tools (Anthropic -> OpenAI), cached across turns
+        openai_tools = self._convert_tools(tools)
 
         # 3. Call OpenAI API
         # Note: Gemini/OpenAI handle max_tokens differently, but usually support the param
@@ -168,7 +219,7 @@ class OpenAIAdapter:
                     "tool_use",
                     id=tool_call.id,
                     name=tool_call.function.name,
-                    input=json.loads(tool_call.function.arguments)
+                    input=_json_loads(tool_call.function.arguments)
                 ))
 
         # Map stop reasons: OpenAI "stop"/"tool_calls" -> Anthropic "end_turn"/"tool_use"
@@ -181,15 +232,198 @@ class OpenAIAdapter:
         else:
             stop_reason = finish_reason # Fallback
 
-        return ResponseWrapper(content_blocks, stop_reason)
+        # 5. Token usage: OpenAI counts cached prompt tokens inside
+        # prompt_tokens, Anthropic reports them as cache_read_input_tokens
+        usage = None
+        if getattr(response, "usage", None) is not None:
+            details = getattr(response.usage, "prompt_tokens_details", None)
+            cached = getattr(details, "cached_tokens", None) or 0
+            usage = Usage(
+                input_tokens=(response.usage.prompt_tokens or 0) - cached,
+                output_tokens=response.usage.completion_tokens or 0,
+                cache_read_input_tokens=cached,
+            )
+
+        return ResponseWrapper(content_blocks, stop_reason, usage)
+
+class CachedClient:
+    """
+    Replays identical requests from a disk cache (enable with RESPONSE_CACHE=1).
+
+    Requests are keyed by a SHA-256 of (model, system, messages, tools,
+    max_tokens). A hit returns the pickled response without touching the
+    network, which makes re-running the same conversation instant and free.
+    Like OpenAIAdapter, it answers client.messages.create(...) itself.
+    """
+    def __init__(self, client, cache_dir: Optional[Path] = None):
+        self.client = client
+        self.messages = self
+        self.cache_dir = cache_dir or Path.home() / ".cache" / "learn-claude-code"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def _jsonable(obj):
+        """Fallback encoder for SDK objects (content blocks) found in history."""
+        if hasattr(obj, "model_dump"):
+            return obj.model_dump()
+        if hasattr(obj, "__dict__"):
+            return vars(obj)
+        return str(obj)
+
+    def create(self, **kwargs):
+        payload = json.dumps(kwargs, sort_keys=True, default=self._jsonable)
+        key = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+        path = self.cache_dir / f"{key}.pkl"
+
+        try:
+            return pickle.loads(path.read_bytes())
+        except Exception:
+            pass  # missing, truncated, or pickled by an SDK version we no longer have
+
+        response = self.client.messages.create(**kwargs)
+        self._store(path, response)
+        return response
+
+    def _store(self, path: Path, response):
+        """
+        Write a cache entry atomically, best effort.
+
+        Each writer gets its own temp file: concurrent subagents can issue
+        the same request, and a shared name would let one os.replace steal
+        the other's file. A failed write only costs a future cache miss.
+        """
+        tmp = None
+        try:
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(response, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except Exception:
+            if tmp is not None:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+
+class PromptCachingClient:
+    """
+    Adds prompt-cache breakpoints to each request (Anthropic API only).
+
+    Every turn resends the same tools and SYSTEM ahead of a history that
+    only grows at the end. Two cache_control breakpoints let the API serve
+    that prefix from its prompt cache instead of reprocessing it:
+
+      - the system block, so tools + SYSTEM are cached once they reach the
+        model's minimum cacheable length
+      - the last block of the last message, so the next turn reads the
+        whole previous conversation from cache and only pays for new turns
+
+    Cache writes cost more than plain input tokens, and third-party
+    Anthropic-compatible endpoints may reject cache_control, so this is
+    opt-in: set PROMPT_CACHE=1.
+    """
+    CACHE_CONTROL = {"type": "ephemeral"}
+
+    def __init__(self, client):
+        self.client = client
+        self.messages = self
+
+    @classmethod
+    def _mark(cls, kwargs: Dict) -> Dict:
+        kwargs = dict(kwargs)
+        system = kwargs.get("system")
+        if isinstance(system, str) and system:
+            kwargs["system"] = [{"type": "text", "text": system, "cache_control": cls.CACHE_CONTROL}]
+
+        # Copy what we touch: the caller's history must stay unmarked, or
+        # old breakpoints would pile up past the API's limit of four
+        messages = kwargs.get("messages")
+        if messages:
+            last = messages[-1]
+            content = last["content"]
+            if isinstance(content, str) and content:
+                content = [{"type": "text", "text": content, "cache_control": cls.CACHE_CONTROL}]
+            elif isinstance(content, list) and content and isinstance(content[-1], dict):
+                content = content[:-1] + [dict(content[-1], cache_control=cls.CACHE_CONTROL)]
+            kwargs["messages"] = messages[:-1] + [dict(last, content=content)]
+        return kwargs
+
+    def create(self, **kwargs):
+        return self.client.messages.create(**self._mark(kwargs))
 
 # =============================================================================
 # Factory Functions
 # =============================================================================
 
+@dataclass(frozen=True)
+class ProviderConfig:
+    """Provider settings, resolved from the environment once per process."""
+    provider: str
+    api_key: Optional[str]
+    base_url: Optional[str]
+    model: Optional[str]
+    response_cache: bool = False
+    prompt_cache: bool = False
+
+@lru_cache(maxsize=1)
+def get_config() -> ProviderConfig:
+    """Read AI_PROVIDER, the provider's key/base URL and MODEL_NAME once."""
+    provider = os.getenv("AI_PROVIDER", "anthropic").lower()
+
+    if provider == "anthropic":
+        api_key = os.getenv("ANTHROPIC_API_KEY")
+        base_url = os.getenv("ANTHROPIC_BASE_URL")
+    elif provider == "openai":
+        api_key = os.getenv("OPENAI_API_KEY")
+        base_url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+    elif provider == "gemini":
+        api_key = os.getenv("GEMINI_API_KEY")
+        # Gemini OpenAI-compatible endpoint
+        base_url = os.getenv("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta/openai/")
+    else:
+        # Generic OpenAI-compatible provider
+        api_key = os.getenv(f"{provider.upper()}_API_KEY")
+        base_url = os.getenv(f"{provider.upper()}_BASE_URL")
+
+    return ProviderConfig(
+        provider=provider,
+        api_key=api_key,
+        base_url=base_url,
+        model=os.getenv("MODEL_NAME"),
+        response_cache=os.getenv("RESPONSE_CACHE") == "1",
+        prompt_cache=os.getenv("PROMPT_CACHE") == "1",
+    )
+
+# One client per process: every caller shares its connection pool
+_CLIENT = None
+
 def get_provider():
     """Get the current AI provider from environment variable."""
-    return os.getenv("AI_PROVIDER", "anthropic").lower()
+    return get_config().provider
+
+def _make_http_client(sdk):
+    """
+    Build a pooled HTTP/2 transport for an SDK client (anthropic or openai).
+
+    HTTP/2 multiplexes concurrent requests over one keep-alive connection
+    instead of paying a TCP/TLS handshake per connection. The SDK's own
+    DefaultHttpxClient keeps its defaults (redirects, timeouts); we only
+    turn on HTTP/2 and widen the pool. Requires the optional `h2` package
+    (pip install "httpx[http2]"); returns None when it or DefaultHttpxClient
+    (older SDKs) is missing, so the SDK uses its default HTTP/1.1 client.
+    """
+    try:
+        import h2  # noqa: F401 - httpx needs it for http2=True
+        import httpx
+    except ImportError:
+        return None
+    if not hasattr(sdk, "DefaultHttpxClient"):
+        return None
+
+    return sdk.DefaultHttpxClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+    )
 
 def get_client():
     """
@@ -197,46 +431,55 @@ def get_client():
     
     If AI_PROVIDER is 'anthropic', returns the native Anthropic client.
     Otherwise, returns an OpenAIAdapter wrapping an OpenAI-compatible client.
+
+    The client is created once and reused by later calls.
     """
-    provider = get_provider()
+    global _CLIENT
+    if _CLIENT is None:
+        config = get_config()
+        _CLIENT = _create_client(config)
+        if config.response_cache:
+            _CLIENT = CachedClient(_CLIENT)
+    return _CLIENT
+
+def _create_client(config: ProviderConfig):
+    """Construct the provider client for get_client()."""
+    provider = config.provider
 
     if provider == "anthropic":
-        from anthropic import Anthropic
-        base_url = os.getenv("ANTHROPIC_BASE_URL")
-        # Return native client - guarantees 100% behavior compatibility
-        return Anthropic(
-            api_key=os.getenv("ANTHROPIC_API_KEY"),
-            base_url=base_url
+        import anthropic
+        # Native client - guarantees 100% behavior compatibility
+        kwargs = {}
+        http_client = _make_http_client(anthropic)
+        if http_client is not None:
+            kwargs["http_client"] = http_client
+        client = anthropic.Anthropic(
+            api_key=config.api_key,
+            base_url=config.base_url,
+            **kwargs
         )
+        return PromptCachingClient(client) if config.prompt_cache else client
     
     else:
         # For OpenAI/Gemini, we wrap the client to mimic Anthropic
         try:
-            from openai import OpenAI
+            import openai
         except ImportError:
             raise ImportError("Please install openai: pip install openai")
 
-        if provider == "openai":
-            api_key = os.getenv("OPENAI_API_KEY")
-            base_url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
-        elif provider == "gemini":
-            api_key = os.getenv("GEMINI_API_KEY")
-            # Gemini OpenAI-compatible endpoint
-            base_url = os.getenv("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta/openai/")
-        else:
-            # Generic OpenAI-compatible provider
-            api_key = os.getenv(f"{provider.upper()}_API_KEY")
-            base_url = os.getenv(f"{provider.upper()}_BASE_URL")
-
-        if not api_key:
+        if not config.api_key:
             raise ValueError(f"API Key for {provider} is missing. Please check your .env file.")
 
-        raw_client = OpenAI(api_key=api_key, base_url=base_url)
+        kwargs = {}
+        http_client = _make_http_client(openai)
+        if http_client is not None:
+            kwargs["http_client"] = http_client
+        raw_client = openai.OpenAI(api_key=config.api_key, base_url=config.base_url, **kwargs)
         return OpenAIAdapter(raw_client)
 
 def get_model():
     """Return model name from environment variable."""
-    model = os.getenv("MODEL_NAME")
+    model = get_config().model
     if not model:
         raise ValueError("MODEL_NAME environment variable is missing. Please set it in your .env file.")
     return model
\ No newline at end of file
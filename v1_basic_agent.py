@@ -47,20 +47,21 @@ Usage:
 """
 
 import os
+import re
+import signal
 import subprocess
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from dotenv import load_dotenv
-
-# Load configuration from .env file
-load_dotenv()
-
-# Import unified client provider
+# Import unified client provider (it loads configuration from .env once)
 try:
     from provider_utils import get_client, get_model
-except ImportError:
-    sys.exit("Error: provider_utils.py not found. Please ensure you are in the project root.")
+except ImportError as e:
+    # Name the real failure: a missing dotenv/SDK is not a missing provider_utils.py
+    sys.exit(f"Error: could not import provider_utils ({e}). "
+             "Run from the project root after `pip install -r requirements.txt`.")
 
 
 # =============================================================================
@@ -71,6 +72,17 @@ WORKDIR = Path.cwd()
 MODEL = get_model()
 client = get_client()
 
+# Upper bound on tool calls executed concurrently within one turn
+MAX_PARALLEL_TOOLS = 8
+
+# Hard cap on captured command output, enforced at the pipe
+MAX_OUTPUT_BYTES = 50000
+
+# Tool output kept in history (chars) before old results are elided,
+# and how many trailing messages are always kept verbatim
+CONTEXT_BUDGET = 200000
+KEEP_RECENT = 6
+
 
 # =============================================================================
 # System Prompt - The only "configuration" the model needs
@@ -195,33 +207,87 @@ def safe_path(p: str) -> Path:
     return path
 
 
+def kill_tree(proc: subprocess.Popen):
+    """
+    Kill a process started with start_new_session=True, children included.
+
+    Killing only the shell is not enough: in `sleep 5 | cat` the children
+    keep the output pipe open, so reading it would block until they exit.
+    Platforms without process groups (Windows) fall back to proc.kill().
+    """
+    if not hasattr(os, "killpg"):
+        proc.kill()
+        return
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except OSError:
+        pass  # the whole group has already exited
+
+
+# Basic safety net for run_bash. The patterns are compiled once into a single
+# alternation, so a command is scanned in one pass instead of once per pattern.
+DANGEROUS_PATTERNS = ["rm -rf /", "sudo", "shutdown", "reboot", "> /dev/"]
+DANGEROUS_RE = re.compile("|".join(map(re.escape, DANGEROUS_PATTERNS)))
+
+
 def run_bash(command: str) -> str:
     """
     Execute shell command with safety checks.
 
     Security: Blocks obviously dangerous commands.
     Timeout: 60 seconds to prevent hanging.
-    Output: Truncated to 50KB to prevent context overflow.
+    Output: Capped at 50KB while reading the pipe. Anything past the
+            cap is read and thrown away rather than buffered in full, so
+            memory stays bounded; a runaway command (`yes`) is stopped
+            by the timeout.
     """
     # Basic safety - block dangerous patterns
-    dangerous = ["rm -rf /", "sudo", "shutdown", "reboot", "> /dev/"]
-    if any(d in command for d in dangerous):
+    if DANGEROUS_RE.search(command):
         return "Error: Dangerous command blocked"
 
     try:
-        result = subprocess.run(
+        proc = subprocess.Popen(
             command,
             shell=True,
             cwd=WORKDIR,
-            capture_output=True,
-            text=True,
-            timeout=60
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,  # own process group, see kill_tree
         )
-        output = (result.stdout + result.stderr).strip()
-        return output[:50000] if output else "(no output)"
+        timed_out = threading.Event()
+
+        def on_timeout():
+            timed_out.set()
+            kill_tree(proc)
+
+        timer = threading.Timer(60, on_timeout)
+        timer.start()
+        try:
+            # read(n) returns at n bytes or EOF, whichever comes first
+            data = proc.stdout.read(MAX_OUTPUT_BYTES)
+            # Past the cap, keep draining (and discarding) the pipe so the
+            # command still runs to completion: `seq 1 20000; touch done`
+            # must create done, it just can't flood the context.
+            truncated = False
+            while proc.stdout.read(65536):
+                truncated = True
+            proc.wait()
+        except BaseException:
+            # Ctrl-C goes to our process group only, not the command's
+            kill_tree(proc)
+            raise
+        finally:
+            timer.cancel()
+            proc.stdout.close()
+
+        if timed_out.is_set():
+            return "Error: Command timed out (60s)"
+
+        output = data.decode("utf-8", errors="replace").strip()
+        if truncated:
+            output += "\n... (output truncated)"
+        return output if output else "(no output)"
 
-    except subprocess.TimeoutExpired:
-        return "Error: Command timed out (60s)"
     except Exception as e:
         return f"Error: {e}"
 
@@ -232,9 +298,12 @@ def run_read(path: str, limit: int = None) -> str:
 
     For large files, use limit to read just the first N lines.
     Output truncated to 50KB to prevent context overflow.
+
+    Files are read as raw bytes and decoded once, so undecodable bytes
+    show up as U+FFFD instead of failing the whole read.
     """
     try:
-        text = safe_path(path).read_text()
+        text = safe_path(path).read_bytes().decode("utf-8", errors="replace")
         lines = text.splitlines()
 
         if limit and limit < len(lines):
@@ -256,9 +325,14 @@ def run_write(path: str, content: str) -> str:
     """
     try:
         fp = safe_path(path)
-        fp.parent.mkdir(parents=True, exist_ok=True)
-        fp.write_text(content)
-        return f"Wrote {len(content)} bytes to {path}"
+        data = content.encode("utf-8")
+        try:
+            fp.write_bytes(data)
+        except FileNotFoundError:
+            # Only pay for mkdir when the parent is actually missing
+            fp.parent.mkdir(parents=True, exist_ok=True)
+            fp.write_bytes(data)
+        return f"Wrote {len(data)} bytes to {path}"
 
     except Exception as e:
         return f"Error: {e}"
@@ -273,36 +347,115 @@ def run_edit(path: str, old_text: str, new_text: str) -> str:
     """
     try:
         fp = safe_path(path)
-        content = fp.read_text()
-
-        if old_text not in content:
+        # Work on bytes: no decode/encode round trip, line endings preserved
+        content = fp.read_bytes()
+        old, new = old_text.encode("utf-8"), new_text.encode("utf-8")
+
+        # One scan finds the first occurrence; splice around it
+        idx = content.find(old)
+        if idx < 0 and b"\r\n" in content:
+            # read_file shows CRLF files as LF lines, so the model's text
+            # uses "\n": match (and write) it in the file's line endings
+            old = old.replace(b"\r\n", b"\n").replace(b"\n", b"\r\n")
+            new = new.replace(b"\r\n", b"\n").replace(b"\n", b"\r\n")
+            idx = content.find(old)
+        if idx < 0:
             return f"Error: Text not found in {path}"
 
         # Replace only first occurrence for safety
-        new_content = content.replace(old_text, new_text, 1)
-        fp.write_text(new_content)
+        new_content = content[:idx] + new + content[idx + len(old):]
+        fp.write_bytes(new_content)
         return f"Edited {path}"
 
     except Exception as e:
         return f"Error: {e}"
 
 
+# Tool name -> handler that unpacks the model's input dict
+TOOL_HANDLERS = {
+    "bash": lambda args: run_bash(args["command"]),
+    "read_file": lambda args: run_read(args["path"], args.get("limit")),
+    "write_file": lambda args: run_write(args["path"], args["content"]),
+    "edit_file": lambda args: run_edit(args["path"], args["old_text"], args["new_text"]),
+}
+
+
 def execute_tool(name: str, args: dict) -> str:
     """
     Dispatch tool call to the appropriate implementation.
 
     This is the bridge between the model's tool calls and actual execution.
     Each tool returns a string result that goes back to the model.
+    Adding a tool means adding one entry to TOOL_HANDLERS.
+    """
+    handler = TOOL_HANDLERS.get(name)
+    if handler is None:
+        return f"Unknown tool: {name}"
+    return handler(args)
+
+
+# Tools that never change state: a turn made only of these runs concurrently
+READ_ONLY_TOOLS = {"read_file"}
+
+
+def execute_tools(tool_calls: list) -> list:
+    """
+    Run one turn's tool calls, returning outputs in call order.
+
+    Calls in one turn may depend on each other (edit a file, then cat it;
+    two edits of the same file), so any turn containing bash, write_file
+    or edit_file runs strictly in order, exactly like a plain for loop.
+    Only a turn made entirely of reads runs concurrently, costing its
+    slowest read instead of the sum.
     """
-    if name == "bash":
-        return run_bash(args["command"])
-    if name == "read_file":
-        return run_read(args["path"], args.get("limit"))
-    if name == "write_file":
-        return run_write(args["path"], args["content"])
-    if name == "edit_file":
-        return run_edit(args["path"], args["old_text"], args["new_text"])
-    return f"Unknown tool: {name}"
+    if len(tool_calls) == 1 or not all(tc.name in READ_ONLY_TOOLS for tc in tool_calls):
+        return [execute_tool(tc.name, tc.input) for tc in tool_calls]
+    workers = min(len(tool_calls), MAX_PARALLEL_TOOLS)
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        return list(pool.map(lambda tc: execute_tool(tc.name, tc.input), tool_calls))
+    finally:
+        # On the normal path every call is done already. On Ctrl-C, drop
+        # the queued calls instead of waiting for them to run first.
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def compact_history(messages: list, keep_recent: int = KEEP_RECENT) -> None:
+    """
+    Elide old tool outputs once history outgrows CONTEXT_BUDGET.
+
+    Every turn re-sends the whole history, so without this input tokens
+    grow quadratically with the number of turns. When the tool output held
+    in history passes the budget, results older than the last `keep_recent`
+    messages are replaced by a one-line stub - oldest first, until the
+    total is back under half the budget.
+
+    This is not a sliding window on purpose: the history prefix only
+    changes when the budget is crossed, so a cached prefix (PROMPT_CACHE=1,
+    or OpenAI's automatic prefix caching) stays valid between compactions
+    instead of being invalidated every turn. tool_use/tool_result pairs
+    stay intact.
+    """
+    old_results = []
+    total = 0
+    for i, msg in enumerate(messages):
+        if msg["role"] != "user" or not isinstance(msg["content"], list):
+            continue
+        for part in msg["content"]:
+            if part.get("type") == "tool_result":
+                total += len(part["content"])
+                if i < len(messages) - keep_recent:
+                    old_results.append(part)
+
+    if total <= CONTEXT_BUDGET:
+        return
+
+    for part in old_results:
+        if total <= CONTEXT_BUDGET // 2:
+            break
+        size = len(part["content"])
+        part["content"] = f"(output elided to save context: {size} chars)"
+        total -= size - len(part["content"])
 
 
 # =============================================================================
@@ -353,14 +506,14 @@ def agent_loop(messages: list) -> list:
             messages.append({"role": "assistant", "content": response.content})
             return messages
 
-        # Step 4: Execute each tool and collect results
-        results = []
+        # Step 4: Execute the tools (see execute_tools) and collect results
         for tc in tool_calls:
-            # Display what's being executed
             print(f"\n> {tc.name}: {tc.input}")
+        outputs = execute_tools(tool_calls)
 
-            # Execute and show result preview
-            output = execute_tool(tc.name, tc.input)
+        results = []
+        for tc, output in zip(tool_calls, outputs):
+            # Show result preview
             preview = output[:200] + "..." if len(output) > 200 else output
             print(f"  {preview}")
 
@@ -376,6 +529,7 @@ def agent_loop(messages: list) -> list:
         # This maintains the alternating user/assistant pattern
         messages.append({"role": "assistant", "content": response.content})
         messages.append({"role": "user", "content": results})
+        compact_history(messages)
 
 
 # =============================================================================
@@ -57,18 +57,21 @@ Usage:
 """
 
 import os
+import re
+import signal
 import subprocess
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from dotenv import load_dotenv
-
-load_dotenv()
-
+# provider_utils loads .env once on import
 try:
     from provider_utils import get_client, get_model
-except ImportError:
-    sys.exit("Error: provider_utils.py not found. Please ensure you are in the project root.")
+except ImportError as e:
+    # Name the real failure: a missing dotenv/SDK is not a missing provider_utils.py
+    sys.exit(f"Error: could not import provider_utils ({e}). "
+             "Run from the project root after `pip install -r requirements.txt`.")
 
 
 # =============================================================================
@@ -80,11 +83,18 @@ WORKDIR = Path.cwd()
 client = get_client()
 MODEL = get_model()
 
+# Upper bound on tool calls executed concurrently within one turn
+MAX_PARALLEL_TOOLS = 8
+
 
 # =============================================================================
 # TodoManager - The core addition in v2
 # =============================================================================
 
+# Checkbox shown for each status in the rendered list
+TODO_MARKS = {"pending": "[ ]", "in_progress": "[>]", "completed": "[x]"}
+
+
 class TodoManager:
     """
     Manages a structured task list with enforced constraints.
@@ -134,7 +144,7 @@ class TodoManager:
             # Validation checks
             if not content:
                 raise ValueError(f"Item {i}: content required")
-            if status not in ("pending", "in_progress", "completed"):
+            if status not in TODO_MARKS:
                 raise ValueError(f"Item {i}: invalid status '{status}'")
             if not active_form:
                 raise ValueError(f"Item {i}: activeForm required")
@@ -175,15 +185,14 @@ class TodoManager:
             return "No todos."
 
         lines = []
+        completed = 0
         for item in self.items:
-            if item["status"] == "completed":
-                lines.append(f"[x] {item['content']}")
-            elif item["status"] == "in_progress":
-                lines.append(f"[>] {item['content']} <- {item['activeForm']}")
-            else:
-                lines.append(f"[ ] {item['content']}")
-
-        completed = sum(1 for t in self.items if t["status"] == "completed")
+            line = f"{TODO_MARKS[item['status']]} {item['content']}"
+            if item["status"] == "in_progress":
+                line += f" <- {item['activeForm']}"
+            lines.append(line)
+            completed += item["status"] == "completed"
+
         lines.append(f"\n({completed}/{len(self.items)} completed)")
 
         return "\n".join(lines)
@@ -322,20 +331,53 @@ def safe_path(p: str) -> Path:
     return path
 
 
+# Blocked command patterns, compiled once (see v1)
+DANGEROUS_RE = re.compile("|".join(map(re.escape, ["rm -rf /", "sudo", "shutdown", "reboot"])))
+
+
+def kill_tree(proc: subprocess.Popen):
+    """Kill a shell and every process it started (see v1)."""
+    if not hasattr(os, "killpg"):
+        proc.kill()
+        return
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except OSError:
+        pass
+
+
 def run_bash(cmd: str) -> str:
     """Execute shell command with safety checks."""
-    dangerous = ["rm -rf /", "sudo", "shutdown", "reboot"]
-    if any(d in cmd for d in dangerous):
+    if DANGEROUS_RE.search(cmd):
         return "Error: Dangerous command blocked"
     try:
-        result = subprocess.run(
+        # Output is capped at the pipe (see v1 run_bash)
+        proc = subprocess.Popen(
             cmd, shell=True, cwd=WORKDIR,
-            capture_output=True, text=True, timeout=60
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            start_new_session=True,
         )
-        output = (result.stdout + result.stderr).strip()
-        return output[:50000] if output else "(no output)"
-    except subprocess.TimeoutExpired:
-        return "Error: Timeout"
+        timed_out = threading.Event()
+        timer = threading.Timer(60, lambda: (timed_out.set(), kill_tree(proc)))
+        timer.start()
+        try:
+            data = proc.stdout.read(50000)
+            truncated = False
+            while proc.stdout.read(65536):  # discard the rest, let it finish
+                truncated = True
+            proc.wait()
+        except BaseException:  # e.g. Ctrl-C, which the command never sees
+            kill_tree(proc)
+            raise
+        finally:
+            timer.cancel()
+            proc.stdout.close()
+        if timed_out.is_set():
+            return "Error: Timeout"
+        output = data.decode("utf-8", errors="replace").strip()
+        if truncated:
+            output += "\n... (output truncated)"
+        return output if output else "(no output)"
     except Exception as e:
         return f"Error: {e}"
 
@@ -343,7 +385,7 @@ def run_bash(cmd: str) -> str:
 def run_read(path: str, limit: int = None) -> str:
     """Read file contents."""
     try:
-        text = safe_path(path).read_text()
+        text = safe_path(path).read_bytes().decode("utf-8", errors="replace")
         lines = text.splitlines()
         if limit and limit < len(lines):
             lines = lines[:limit] + [f"... ({len(text.splitlines()) - limit} more)"]
@@ -356,9 +398,13 @@ def run_write(path: str, content: str) -> str:
     """Write content to file."""
     try:
         fp = safe_path(path)
-        fp.parent.mkdir(parents=True, exist_ok=True)
-        fp.write_text(content)
-        return f"Wrote {len(content)} bytes to {path}"
+        data = content.encode("utf-8")
+        try:
+            fp.write_bytes(data)
+        except FileNotFoundError:
+            fp.parent.mkdir(parents=True, exist_ok=True)
+            fp.write_bytes(data)
+        return f"Wrote {len(data)} bytes to {path}"
     except Exception as e:
         return f"Error: {e}"
 
@@ -367,10 +413,17 @@ def run_edit(path: str, old_text: str, new_text: str) -> str:
     """Replace exact text in file."""
     try:
         fp = safe_path(path)
-        content = fp.read_text()
-        if old_text not in content:
+        content = fp.read_bytes()
+        old, new = old_text.encode("utf-8"), new_text.encode("utf-8")
+        idx = content.find(old)
+        if idx < 0 and b"\r\n" in content:
+            # Model sees CRLF files as LF lines (see v1)
+            old = old.replace(b"\r\n", b"\n").replace(b"\n", b"\r\n")
+            new = new.replace(b"\r\n", b"\n").replace(b"\n", b"\r\n")
+            idx = content.find(old)
+        if idx < 0:
             return f"Error: Text not found in {path}"
-        fp.write_text(content.replace(old_text, new_text, 1))
+        fp.write_bytes(content[:idx] + new + content[idx + len(old):])
         return f"Edited {path}"
     except Exception as e:
         return f"Error: {e}"
@@ -389,19 +442,41 @@ def run_todo(items: list) -> str:
         return f"Error: {e}"
 
 
+TOOL_HANDLERS = {
+    "bash": lambda args: run_bash(args["command"]),
+    "read_file": lambda args: run_read(args["path"], args.get("limit")),
+    "write_file": lambda args: run_write(args["path"], args["content"]),
+    "edit_file": lambda args: run_edit(args["path"], args["old_text"], args["new_text"]),
+    "TodoWrite": lambda args: run_todo(args["items"]),
+}
+
+
 def execute_tool(name: str, args: dict) -> str:
     """Dispatch tool call to implementation."""
-    if name == "bash":
-        return run_bash(args["command"])
-    if name == "read_file":
-        return run_read(args["path"], args.get("limit"))
-    if name == "write_file":
-        return run_write(args["path"], args["content"])
-    if name == "edit_file":
-        return run_edit(args["path"], args["old_text"], args["new_text"])
-    if name == "TodoWrite":
-        return run_todo(args["items"])
-    return f"Unknown tool: {name}"
+    handler = TOOL_HANDLERS.get(name)
+    if handler is None:
+        return f"Unknown tool: {name}"
+    return handler(args)
+
+
+# Tools that never change state: a turn made only of these runs concurrently
+READ_ONLY_TOOLS = {"read_file"}
+
+
+def execute_tools(tool_calls: list) -> list:
+    """
+    Run one turn's tool calls, returning outputs in call order.
+
+    Calls in one turn may depend on each other (edit a file, then cat it;
+    two edits to the same file), so any turn containing bash, write_file,
+    edit_file or TodoWrite runs strictly in order. Only all-read-only turns
+    run concurrently, costing their slowest call instead of the sum.
+    """
+    if len(tool_calls) == 1 or not all(tc.name in READ_ONLY_TOOLS for tc in tool_calls):
+        return [execute_tool(tc.name, tc.input) for tc in tool_calls]
+    workers = min(len(tool_calls), MAX_PARALLEL_TOOLS)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda tc: execute_tool(tc.name, tc.input), tool_calls))
 
 
 # =============================================================================
@@ -442,12 +517,14 @@ def agent_loop(messages: list) -> list:
             messages.append({"role": "assistant", "content": response.content})
             return messages
 
+        for tc in tool_calls:
+            print(f"\n> {tc.name}")
+        outputs = execute_tools(tool_calls)
+
         results = []
         used_todo = False
 
-        for tc in tool_calls:
-            print(f"\n> {tc.name}")
-            output = execute_tool(tc.name, tc.input)
+        for tc, output in zip(tool_calls, outputs):
             preview = output[:300] + "..." if len(output) > 300 else output
             print(f"  {preview}")
 
@@ -74,19 +74,23 @@ Usage:
 """
 
 import os
+import re
+import signal
 import subprocess
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
-from dotenv import load_dotenv
-
-load_dotenv()
-
+# provider_utils loads .env once on import
 try:
     from provider_utils import get_client, get_model
-except ImportError:
-    sys.exit("Error: provider_utils.py not found. Please ensure you are in the project root.")
+except ImportError as e:
+    # Name the real failure: a missing dotenv/SDK is not a missing provider_utils.py
+    sys.exit(f"Error: could not import provider_utils ({e}). "
+             "Run from the project root after `pip install -r requirements.txt`.")
 
 
 # =============================================================================
@@ -98,6 +102,9 @@ WORKDIR = Path.cwd()
 client = get_client()
 MODEL = get_model()
 
+# Upper bound on tool calls executed concurrently within one turn
+MAX_PARALLEL_TOOLS = 8
+
 
 # =============================================================================
 # Agent Type Registry - The core of subagent mechanism
@@ -138,10 +145,17 @@ def get_agent_descriptions() -> str:
     )
 
 
+# The registry is fixed, so the system prompt and Task tool share one rendering
+AGENT_DESCRIPTIONS = get_agent_descriptions()
+
+
 # =============================================================================
 # TodoManager (from v2, unchanged)
 # =============================================================================
 
+TODO_MARKS = {"pending": "[ ]", "in_progress": "[>]", "completed": "[x]"}
+
+
 class TodoManager:
     """Task list manager with constraints. See v2 for details."""
 
@@ -159,7 +173,7 @@ class TodoManager:
 
             if not content or not active:
                 raise ValueError(f"Item {i}: content and activeForm required")
-            if status not in ("pending", "in_progress", "completed"):
+            if status not in TODO_MARKS:
                 raise ValueError(f"Item {i}: invalid status")
             if status == "in_progress":
                 in_progress += 1
@@ -180,11 +194,10 @@ class TodoManager:
         if not self.items:
             return "No todos."
         lines = []
+        done = 0
         for t in self.items:
-            mark = "[x]" if t["status"] == "completed" else \
-                   "[>]" if t["status"] == "in_progress" else "[ ]"
-            lines.append(f"{mark} {t['content']}")
-        done = sum(1 for t in self.items if t["status"] == "completed")
+            lines.append(f"{TODO_MARKS[t['status']]} {t['content']}")
+            done += t["status"] == "completed"
         return "\n".join(lines) + f"\n({done}/{len(self.items)} done)"
 
 
@@ -200,7 +213,7 @@ SYSTEM = f"""You are a coding agent at {WORKDIR}.
 Loop: plan -> act with tools -> report.
 
 You can spawn subagents for complex subtasks:
-{get_agent_descriptions()}
+{AGENT_DESCRIPTIONS}
 
 Rules:
 - Use Task tool for subtasks that need focused exploration or implementation
@@ -300,7 +313,7 @@ Subagents run in ISOLATED context - they don't see parent's history.
 Use this to keep the main conversation clean.
 
 Agent types:
-{get_agent_descriptions()}
+{AGENT_DESCRIPTIONS}
 
 Example uses:
 - Task(explore): "Find all files using the auth module"
@@ -332,19 +345,23 @@ Example uses:
 ALL_TOOLS = BASE_TOOLS + [TASK_TOOL]
 
 
-def get_tools_for_agent(agent_type: str) -> list:
+@lru_cache(maxsize=None)
+def get_tools_for_agent(agent_type: str) -> tuple:
     """
     Filter tools based on agent type.
 
     Each agent type has a whitelist of allowed tools.
     '*' means all tools (but subagents don't get Task to prevent infinite recursion).
+
+    Memoized: the agent types are fixed, so every subagent of a type shares
+    one immutable tuple (and the provider adapter's converted-schema cache).
     """
     allowed = AGENT_TYPES.get(agent_type, {}).get("tools", "*")
 
     if allowed == "*":
-        return BASE_TOOLS  # All base tools, but NOT Task (no recursion in demo)
+        return tuple(BASE_TOOLS)  # All base tools, but NOT Task (no recursion in demo)
 
-    return [t for t in BASE_TOOLS if t["name"] in allowed]
+    return tuple(t for t in BASE_TOOLS if t["name"] in allowed)
 
 
 # =============================================================================
@@ -359,16 +376,53 @@ def safe_path(p: str) -> Path:
     return path
 
 
+# Blocked command patterns, compiled once (see v1)
+DANGEROUS_RE = re.compile("|".join(map(re.escape, ["rm -rf /", "sudo", "shutdown"])))
+
+
+def kill_tree(proc: subprocess.Popen):
+    """Kill a shell and every process it started (see v1)."""
+    if not hasattr(os, "killpg"):
+        proc.kill()
+        return
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except OSError:
+        pass
+
+
 def run_bash(cmd: str) -> str:
     """Execute shell command with safety checks."""
-    if any(d in cmd for d in ["rm -rf /", "sudo", "shutdown"]):
+    if DANGEROUS_RE.search(cmd):
         return "Error: Dangerous command"
     try:
-        r = subprocess.run(
+        # Output is capped at the pipe (see v1 run_bash)
+        proc = subprocess.Popen(
             cmd, shell=True, cwd=WORKDIR,
-            capture_output=True, text=True, timeout=60
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            start_new_session=True,
         )
-        return ((r.stdout + r.stderr).strip() or "(no output)")[:50000]
+        timed_out = threading.Event()
+        timer = threading.Timer(60, lambda: (timed_out.set(), kill_tree(proc)))
+        timer.start()
+        try:
+            data = proc.stdout.read(50000)
+            truncated = False
+            while proc.stdout.read(65536):  # discard the rest, let it finish
+                truncated = True
+            proc.wait()
+        except BaseException:  # e.g. Ctrl-C, which the command never sees
+            kill_tree(proc)
+            raise
+        finally:
+            timer.cancel()
+            proc.stdout.close()
+        if timed_out.is_set():
+            return "Error: Command timed out (60s)"
+        output = data.decode("utf-8", errors="replace").strip()
+        if truncated:
+            output += "\n... (output truncated)"
+        return output or "(no output)"
     except Exception as e:
         return f"Error: {e}"
 
@@ -376,7 +430,7 @@ def run_bash(cmd: str) -> str:
 def run_read(path: str, limit: int = None) -> str:
     """Read file contents."""
     try:
-        lines = safe_path(path).read_text().splitlines()
+        lines = safe_path(path).read_bytes().decode("utf-8", errors="replace").splitlines()
         if limit:
             lines = lines[:limit]
         return "\n".join(lines)[:50000]
@@ -388,9 +442,13 @@ def run_write(path: str, content: str) -> str:
     """Write content to file."""
     try:
         fp = safe_path(path)
-        fp.parent.mkdir(parents=True, exist_ok=True)
-        fp.write_text(content)
-        return f"Wrote {len(content)} bytes to {path}"
+        data = content.encode("utf-8")
+        try:
+            fp.write_bytes(data)
+        except FileNotFoundError:
+            fp.parent.mkdir(parents=True, exist_ok=True)
+            fp.write_bytes(data)
+        return f"Wrote {len(data)} bytes to {path}"
     except Exception as e:
         return f"Error: {e}"
 
@@ -399,10 +457,17 @@ def run_edit(path: str, old_text: str, new_text: str) -> str:
     """Replace exact text in file."""
     try:
         fp = safe_path(path)
-        text = fp.read_text()
-        if old_text not in text:
+        data = fp.read_bytes()
+        old, new = old_text.encode("utf-8"), new_text.encode("utf-8")
+        idx = data.find(old)
+        if idx < 0 and b"\r\n" in data:
+            # Model sees CRLF files as LF lines (see v1)
+            old = old.replace(b"\r\n", b"\n").replace(b"\n", b"\r\n")
+            new = new.replace(b"\r\n", b"\n").replace(b"\n", b"\r\n")
+            idx = data.find(old)
+        if idx < 0:
             return f"Error: Text not found in {path}"
-        fp.write_text(text.replace(old_text, new_text, 1))
+        fp.write_bytes(data[:idx] + new + data[idx + len(old):])
         return f"Edited {path}"
     except Exception as e:
         return f"Error: {e}"
@@ -420,6 +485,12 @@ def run_todo(items: list) -> str:
 # Subagent Execution - The heart of v3
 # =============================================================================
 
+# A lone subagent redraws its progress line in place. Subagents running
+# concurrently (see execute_tools) print whole lines under this lock instead.
+PROGRESS_LOCK = threading.Lock()
+_progress = threading.local()
+
+
 def run_task(description: str, prompt: str, agent_type: str) -> str:
     """
     Execute a subagent task with isolated context.
@@ -439,6 +510,9 @@ def run_task(description: str, prompt: str, agent_type: str) -> str:
     While running, we show:
       [explore] find auth files ... 5 tools, 3.2s
 
+    When several Tasks run at once, each prints only its start and done
+    lines, since in-place redraws would overwrite one another.
+
     This gives visibility without polluting the main conversation.
     """
     if agent_type not in AGENT_TYPES:
@@ -461,7 +535,9 @@ Complete the task and return a clear, concise summary."""
     sub_messages = [{"role": "user", "content": prompt}]
 
     # Progress tracking
-    print(f"  [{agent_type}] {description}")
+    concurrent = getattr(_progress, "concurrent", False)
+    with PROGRESS_LOCK:
+        print(f"  [{agent_type}] {description}")
     start = time.time()
     tool_count = 0
 
@@ -479,18 +555,15 @@ Complete the task and return a clear, concise summary."""
             break
 
         tool_calls = [b for b in response.content if b.type == "tool_use"]
-        results = []
-
-        for tc in tool_calls:
-            tool_count += 1
-            output = execute_tool(tc.name, tc.input)
-            results.append({
-                "type": "tool_result",
-                "tool_use_id": tc.id,
-                "content": output
-            })
-
-            # Update progress line (in-place)
+        outputs = execute_tools(tool_calls)
+        results = [
+            {"type": "tool_result", "tool_use_id": tc.id, "content": output}
+            for tc, output in zip(tool_calls, outputs)
+        ]
+        tool_count += len(tool_calls)
+
+        # Update progress line (in-place), once per batch of tool calls
+        if not concurrent:
             elapsed = time.time() - start
             sys.stdout.write(
                 f"\r  [{agent_type}] {description} ... {tool_count} tools, {elapsed:.1f}s"
@@ -502,34 +575,70 @@ Complete the task and return a clear, concise summary."""
 
     # Final progress update
     elapsed = time.time() - start
-    sys.stdout.write(
-        f"\r  [{agent_type}] {description} - done ({tool_count} tools, {elapsed:.1f}s)\n"
-    )
+    done = f"  [{agent_type}] {description} - done ({tool_count} tools, {elapsed:.1f}s)\n"
+    with PROGRESS_LOCK:
+        sys.stdout.write(done if concurrent else "\r" + done)
+        sys.stdout.flush()
 
     # Extract and return only the final text
     # This is what the parent agent sees - a clean summary
     for block in response.content:
-        if hasattr(block, "text"):
-            return block.text
+        text = getattr(block, "text", None)
+        if text is not None:
+            return text
 
     return "(subagent returned no text)"
 
 
+TOOL_HANDLERS = {
+    "bash": lambda args: run_bash(args["command"]),
+    "read_file": lambda args: run_read(args["path"], args.get("limit")),
+    "write_file": lambda args: run_write(args["path"], args["content"]),
+    "edit_file": lambda args: run_edit(args["path"], args["old_text"], args["new_text"]),
+    "TodoWrite": lambda args: run_todo(args["items"]),
+    "Task": lambda args: run_task(args["description"], args["prompt"], args["agent_type"]),
+}
+
+
 def execute_tool(name: str, args: dict) -> str:
     """Dispatch tool call to implementation."""
-    if name == "bash":
-        return run_bash(args["command"])
-    if name == "read_file":
-        return run_read(args["path"], args.get("limit"))
-    if name == "write_file":
-        return run_write(args["path"], args["content"])
-    if name == "edit_file":
-        return run_edit(args["path"], args["old_text"], args["new_text"])
-    if name == "TodoWrite":
-        return run_todo(args["items"])
-    if name == "Task":
-        return run_task(args["description"], args["prompt"], args["agent_type"])
-    return f"Unknown tool: {name}"
+    handler = TOOL_HANDLERS.get(name)
+    if handler is None:
+        return f"Unknown tool: {name}"
+    return handler(args)
+
+
+# Calls that never change state: read_file, and Tasks for read-only agents
+READ_ONLY_TOOLS = {"read_file"}
+READ_ONLY_AGENTS = {"explore", "plan"}
+
+
+def is_read_only(tc) -> bool:
+    if tc.name == "Task":
+        return tc.input.get("agent_type") in READ_ONLY_AGENTS
+    return tc.name in READ_ONLY_TOOLS
+
+
+def execute_tools(tool_calls: list) -> list:
+    """
+    Run one turn's tool calls, returning outputs in call order.
+
+    Any turn containing a call that changes state (bash, write_file,
+    edit_file, TodoWrite, a code subagent) runs strictly in order, as later
+    calls may depend on earlier ones (see v2). All-read-only turns run
+    concurrently: parallel explore/plan subagents then switch to
+    line-based progress output.
+    """
+    if len(tool_calls) == 1 or not all(map(is_read_only, tool_calls)):
+        return [execute_tool(tc.name, tc.input) for tc in tool_calls]
+
+    def run(tc):
+        _progress.concurrent = True
+        return execute_tool(tc.name, tc.input)
+
+    workers = min(len(tool_calls), MAX_PARALLEL_TOOLS)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run, tool_calls))
 
 
 # =============================================================================
@@ -563,7 +672,6 @@ def agent_loop(messages: list) -> list:
             messages.append({"role": "assistant", "content": response.content})
             return messages
 
-        results = []
         for tc in tool_calls:
             # Task tool has special display handling
             if tc.name == "Task":
@@ -571,8 +679,10 @@ def agent_loop(messages: list) -> list:
             else:
                 print(f"\n> {tc.name}")
 
-            output = execute_tool(tc.name, tc.input)
+        outputs = execute_tools(tool_calls)
 
+        results = []
+        for tc, output in zip(tool_calls, outputs):
             # Don't print full Task output (it manages its own display)
             if tc.name != "Task":
                 preview = output[:200] + "..." if len(output) > 200 else output
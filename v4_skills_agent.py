@@ -79,19 +79,22 @@ Usage:
 
 import os
 import re
+import signal
 import subprocess
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
-from dotenv import load_dotenv
-
-load_dotenv()
-
+# provider_utils loads .env once on import
 try:
     from provider_utils import get_client, get_model
-except ImportError:
-    sys.exit("Error: provider_utils.py not found. Please ensure you are in the project root.")
+except ImportError as e:
+    # Name the real failure: a missing dotenv/SDK is not a missing provider_utils.py
+    sys.exit(f"Error: could not import provider_utils ({e}). "
+             "Run from the project root after `pip install -r requirements.txt`.")
 
 
 # =============================================================================
@@ -104,11 +107,18 @@ SKILLS_DIR = WORKDIR / "skills"
 client = get_client()
 MODEL = get_model()
 
+# Upper bound on tool calls executed concurrently within one turn
+MAX_PARALLEL_TOOLS = 8
+
 
 # =============================================================================
 # SkillLoader - The core addition in v4
 # =============================================================================
 
+# YAML frontmatter between --- markers, then the markdown body; compiled once
+FRONTMATTER_RE = re.compile(r"^---\s*\n(.*?)\n---\s*\n(.*)$", re.DOTALL)
+
+
 class SkillLoader:
     """
     Loads and manages skills from SKILL.md files.
@@ -143,6 +153,7 @@ class SkillLoader:
     def __init__(self, skills_dir: Path):
         self.skills_dir = skills_dir
         self.skills = {}
+        self._content_cache = {}  # name -> rendered Layer 2 content
         self.load_skills()
 
     def parse_skill_md(self, path: Path) -> dict:
@@ -155,7 +166,7 @@ class SkillLoader:
         content = path.read_text()
 
         # Match YAML frontmatter between --- markers
-        match = re.match(r"^---\s*\n(.*?)\n---\s*\n(.*)$", content, re.DOTALL)
+        match = FRONTMATTER_RE.match(content)
         if not match:
             return None
 
@@ -186,21 +197,28 @@ class SkillLoader:
 
         Only loads metadata at startup - body is loaded on-demand.
         This keeps the initial context lean.
+
+        One scandir pass walks the directory (entry types come with it); a
+        folder without SKILL.md is skipped when opening it fails, rather
+        than stat-ing every path up front.
         """
-        if not self.skills_dir.exists():
+        try:
+            entries = os.scandir(self.skills_dir)
+        except OSError:
             return
 
-        for skill_dir in self.skills_dir.iterdir():
-            if not skill_dir.is_dir():
-                continue
+        with entries:
+            for entry in entries:
+                if not entry.is_dir():
+                    continue
 
-            skill_md = skill_dir / "SKILL.md"
-            if not skill_md.exists():
-                continue
+                try:
+                    skill = self.parse_skill_md(Path(entry.path) / "SKILL.md")
+                except FileNotFoundError:
+                    continue
 
-            skill = self.parse_skill_md(skill_md)
-            if skill:
-                self.skills[skill["name"]] = skill
+                if skill:
+                    self.skills[skill["name"]] = skill
 
     def get_descriptions(self) -> str:
         """
@@ -225,10 +243,17 @@ class SkillLoader:
         resources (Layer 3 hints).
 
         Returns None if skill not found.
+
+        The rendered content is cached per skill: re-invoking a skill in the
+        same session costs a dict lookup, not a rescan of its resource folders.
         """
         if name not in self.skills:
             return None
 
+        cached = self._content_cache.get(name)
+        if cached is not None:
+            return cached
+
         skill = self.skills[name]
         content = f"# Skill: {skill['name']}\n\n{skill['body']}"
 
@@ -239,16 +264,21 @@ class SkillLoader:
             ("references", "References"),
             ("assets", "Assets")
         ]:
-            folder_path = skill["dir"] / folder
-            if folder_path.exists():
-                files = list(folder_path.glob("*"))
-                if files:
-                    resources.append(f"{label}: {', '.join(f.name for f in files)}")
+            # One directory read per folder; a missing folder just fails it.
+            # Dotfiles (.gitkeep) are skipped, as glob("*") used to.
+            try:
+                with os.scandir(skill["dir"] / folder) as entries:
+                    files = [e.name for e in entries if not e.name.startswith(".")]
+            except OSError:
+                continue
+            if files:
+                resources.append(f"{label}: {', '.join(files)}")
 
         if resources:
             content += f"\n\n**Available resources in {skill['dir']}:**\n"
             content += "\n".join(f"- {r}" for r in resources)
 
+        self._content_cache[name] = content
         return content
 
     def list_skills(self) -> list:
@@ -259,6 +289,9 @@ class SkillLoader:
 # Global skill loader instance
 SKILLS = SkillLoader(SKILLS_DIR)
 
+# Rendered once for both the system prompt and the Skill tool description
+SKILL_DESCRIPTIONS = SKILLS.get_descriptions()
+
 
 # =============================================================================
 # Agent Type Registry (from v3)
@@ -291,10 +324,17 @@ def get_agent_descriptions() -> str:
     )
 
 
+# The registry is fixed, so the system prompt and Task tool share one rendering
+AGENT_DESCRIPTIONS = get_agent_descriptions()
+
+
 # =============================================================================
 # TodoManager (from v2)
 # =============================================================================
 
+TODO_MARKS = {"pending": "[ ]", "in_progress": "[>]", "completed": "[x]"}
+
+
 class TodoManager:
     """Task list manager with constraints. See v2 for details."""
 
@@ -312,7 +352,7 @@ class TodoManager:
 
             if not content or not active:
                 raise ValueError(f"Item {i}: content and activeForm required")
-            if status not in ("pending", "in_progress", "completed"):
+            if status not in TODO_MARKS:
                 raise ValueError(f"Item {i}: invalid status")
             if status == "in_progress":
                 in_progress += 1
@@ -333,11 +373,10 @@ class TodoManager:
         if not self.items:
             return "No todos."
         lines = []
+        done = 0
         for t in self.items:
-            mark = "[x]" if t["status"] == "completed" else \
-                   "[>]" if t["status"] == "in_progress" else "[ ]"
-            lines.append(f"{mark} {t['content']}")
-        done = sum(1 for t in self.items if t["status"] == "completed")
+            lines.append(f"{TODO_MARKS[t['status']]} {t['content']}")
+            done += t["status"] == "completed"
         return "\n".join(lines) + f"\n({done}/{len(self.items)} done)"
 
 
@@ -353,10 +392,10 @@ SYSTEM = f"""You are a coding agent at {WORKDIR}.
 Loop: plan -> act with tools -> report.
 
 **Skills available** (invoke with Skill tool when task matches):
-{SKILLS.get_descriptions()}
+{SKILL_DESCRIPTIONS}
 
 **Subagents available** (invoke with Task tool for focused subtasks):
-{get_agent_descriptions()}
+{AGENT_DESCRIPTIONS}
 
 Rules:
 - Use Skill tool IMMEDIATELY when a task matches a skill description
@@ -447,7 +486,7 @@ BASE_TOOLS = [
 # Task tool (from v3)
 TASK_TOOL = {
     "name": "Task",
-    "description": f"Spawn a subagent for a focused subtask.\n\nAgent types:\n{get_agent_descriptions()}",
+    "description": f"Spawn a subagent for a focused subtask.\n\nAgent types:\n{AGENT_DESCRIPTIONS}",
     "input_schema": {
         "type": "object",
         "properties": {
@@ -474,7 +513,7 @@ SKILL_TOOL = {
     "description": f"""Load a skill to gain specialized knowledge for a task.
 
 Available skills:
-{SKILLS.get_descriptions()}
+{SKILL_DESCRIPTIONS}
 
 When to use:
 - IMMEDIATELY when user task matches a skill description
@@ -497,12 +536,13 @@ detailed instructions and access to resources.""",
 ALL_TOOLS = BASE_TOOLS + [TASK_TOOL, SKILL_TOOL]
 
 
-def get_tools_for_agent(agent_type: str) -> list:
-    """Filter tools based on agent type."""
+@lru_cache(maxsize=None)
+def get_tools_for_agent(agent_type: str) -> tuple:
+    """Filter tools based on agent type (memoized, see v3)."""
     allowed = AGENT_TYPES.get(agent_type, {}).get("tools", "*")
     if allowed == "*":
-        return BASE_TOOLS
-    return [t for t in BASE_TOOLS if t["name"] in allowed]
+        return tuple(BASE_TOOLS)
+    return tuple(t for t in BASE_TOOLS if t["name"] in allowed)
 
 
 # =============================================================================
@@ -517,16 +557,53 @@ def safe_path(p: str) -> Path:
     return path
 
 
+# Blocked command patterns, compiled once (see v1)
+DANGEROUS_RE = re.compile("|".join(map(re.escape, ["rm -rf /", "sudo", "shutdown"])))
+
+
+def kill_tree(proc: subprocess.Popen):
+    """Kill a shell and every process it started (see v1)."""
+    if not hasattr(os, "killpg"):
+        proc.kill()
+        return
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except OSError:
+        pass
+
+
 def run_bash(cmd: str) -> str:
     """Execute shell command."""
-    if any(d in cmd for d in ["rm -rf /", "sudo", "shutdown"]):
+    if DANGEROUS_RE.search(cmd):
         return "Error: Dangerous command"
     try:
-        r = subprocess.run(
+        # Output is capped at the pipe (see v1 run_bash)
+        proc = subprocess.Popen(
             cmd, shell=True, cwd=WORKDIR,
-            capture_output=True, text=True, timeout=60
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            start_new_session=True,
         )
-        return ((r.stdout + r.stderr).strip() or "(no output)")[:50000]
+        timed_out = threading.Event()
+        timer = threading.Timer(60, lambda: (timed_out.set(), kill_tree(proc)))
+        timer.start()
+        try:
+            data = proc.stdout.read(50000)
+            truncated = False
+            while proc.stdout.read(65536):  # discard the rest, let it finish
+                truncated = True
+            proc.wait()
+        except BaseException:  # e.g. Ctrl-C, which the command never sees
+            kill_tree(proc)
+            raise
+        finally:
+            timer.cancel()
+            proc.stdout.close()
+        if timed_out.is_set():
+            return "Error: Command timed out (60s)"
+        output = data.decode("utf-8", errors="replace").strip()
+        if truncated:
+            output += "\n... (output truncated)"
+        return output or "(no output)"
     except Exception as e:
         return f"Error: {e}"
 
@@ -534,7 +611,7 @@ def run_bash(cmd: str) -> str:
 def run_read(path: str, limit: int = None) -> str:
     """Read file contents."""
     try:
-        lines = safe_path(path).read_text().splitlines()
+        lines = safe_path(path).read_bytes().decode("utf-8", errors="replace").splitlines()
         if limit:
             lines = lines[:limit]
         return "\n".join(lines)[:50000]
@@ -546,9 +623,13 @@ def run_write(path: str, content: str) -> str:
     """Write content to file."""
     try:
         fp = safe_path(path)
-        fp.parent.mkdir(parents=True, exist_ok=True)
-        fp.write_text(content)
-        return f"Wrote {len(content)} bytes to {path}"
+        data = content.encode("utf-8")
+        try:
+            fp.write_bytes(data)
+        except FileNotFoundError:
+            fp.parent.mkdir(parents=True, exist_ok=True)
+            fp.write_bytes(data)
+        return f"Wrote {len(data)} bytes to {path}"
     except Exception as e:
         return f"Error: {e}"
 
@@ -557,10 +638,17 @@ def run_edit(path: str, old_text: str, new_text: str) -> str:
     """Replace exact text in file."""
     try:
         fp = safe_path(path)
-        text = fp.read_text()
-        if old_text not in text:
+        data = fp.read_bytes()
+        old, new = old_text.encode("utf-8"), new_text.encode("utf-8")
+        idx = data.find(old)
+        if idx < 0 and b"\r\n" in data:
+            # Model sees CRLF files as LF lines (see v1)
+            old = old.replace(b"\r\n", b"\n").replace(b"\n", b"\r\n")
+            new = new.replace(b"\r\n", b"\n").replace(b"\n", b"\r\n")
+            idx = data.find(old)
+        if idx < 0:
             return f"Error: Text not found in {path}"
-        fp.write_text(text.replace(old_text, new_text, 1))
+        fp.write_bytes(data[:idx] + new + data[idx + len(old):])
         return f"Edited {path}"
     except Exception as e:
         return f"Error: {e}"
@@ -604,6 +692,11 @@ def run_skill(skill_name: str) -> str:
 Follow the instructions in the skill above to complete the user's task."""
 
 
+# Progress display state for concurrent subagents (see v3)
+PROGRESS_LOCK = threading.Lock()
+_progress = threading.local()
+
+
 def run_task(description: str, prompt: str, agent_type: str) -> str:
     """Execute a subagent task (from v3). See v3 for details."""
     if agent_type not in AGENT_TYPES:
@@ -619,7 +712,9 @@ Complete the task and return a clear, concise summary."""
     sub_tools = get_tools_for_agent(agent_type)
     sub_messages = [{"role": "user", "content": prompt}]
 
-    print(f"  [{agent_type}] {description}")
+    concurrent = getattr(_progress, "concurrent", False)
+    with PROGRESS_LOCK:
+        print(f"  [{agent_type}] {description}")
     start = time.time()
     tool_count = 0
 
@@ -636,17 +731,14 @@ Complete the task and return a clear, concise summary."""
             break
 
         tool_calls = [b for b in response.content if b.type == "tool_use"]
-        results = []
-
-        for tc in tool_calls:
-            tool_count += 1
-            output = execute_tool(tc.name, tc.input)
-            results.append({
-                "type": "tool_result",
-                "tool_use_id": tc.id,
-                "content": output
-            })
-
+        outputs = execute_tools(tool_calls)
+        results = [
+            {"type": "tool_result", "tool_use_id": tc.id, "content": output}
+            for tc, output in zip(tool_calls, outputs)
+        ]
+        tool_count += len(tool_calls)
+
+        if not concurrent:
             elapsed = time.time() - start
             sys.stdout.write(
                 f"\r  [{agent_type}] {description} ... {tool_count} tools, {elapsed:.1f}s"
@@ -657,34 +749,61 @@ Complete the task and return a clear, concise summary."""
         sub_messages.append({"role": "user", "content": results})
 
     elapsed = time.time() - start
-    sys.stdout.write(
-        f"\r  [{agent_type}] {description} - done ({tool_count} tools, {elapsed:.1f}s)\n"
-    )
+    done = f"  [{agent_type}] {description} - done ({tool_count} tools, {elapsed:.1f}s)\n"
+    with PROGRESS_LOCK:
+        sys.stdout.write(done if concurrent else "\r" + done)
+        sys.stdout.flush()
 
     for block in response.content:
-        if hasattr(block, "text"):
-            return block.text
+        text = getattr(block, "text", None)
+        if text is not None:
+            return text
 
     return "(subagent returned no text)"
 
 
+TOOL_HANDLERS = {
+    "bash": lambda args: run_bash(args["command"]),
+    "read_file": lambda args: run_read(args["path"], args.get("limit")),
+    "write_file": lambda args: run_write(args["path"], args["content"]),
+    "edit_file": lambda args: run_edit(args["path"], args["old_text"], args["new_text"]),
+    "TodoWrite": lambda args: run_todo(args["items"]),
+    "Task": lambda args: run_task(args["description"], args["prompt"], args["agent_type"]),
+    "Skill": lambda args: run_skill(args["skill"]),
+}
+
+
 def execute_tool(name: str, args: dict) -> str:
     """Dispatch tool call to implementation."""
-    if name == "bash":
-        return run_bash(args["command"])
-    if name == "read_file":
-        return run_read(args["path"], args.get("limit"))
-    if name == "write_file":
-        return run_write(args["path"], args["content"])
-    if name == "edit_file":
-        return run_edit(args["path"], args["old_text"], args["new_text"])
-    if name == "TodoWrite":
-        return run_todo(args["items"])
-    if name == "Task":
-        return run_task(args["description"], args["prompt"], args["agent_type"])
-    if name == "Skill":
-        return run_skill(args["skill"])
-    return f"Unknown tool: {name}"
+    handler = TOOL_HANDLERS.get(name)
+    if handler is None:
+        return f"Unknown tool: {name}"
+    return handler(args)
+
+
+# Calls that never change state (see v3); loading a skill only reads
+READ_ONLY_TOOLS = {"read_file", "Skill"}
+READ_ONLY_AGENTS = {"explore", "plan"}
+
+
+def is_read_only(tc) -> bool:
+    if tc.name == "Task":
+        return tc.input.get("agent_type") in READ_ONLY_AGENTS
+    return tc.name in READ_ONLY_TOOLS
+
+
+def execute_tools(tool_calls: list) -> list:
+    """Run a turn's calls in order, or concurrently if all read-only (see v3)."""
+    if len(tool_calls) == 1 or not all(map(is_read_only, tool_calls)):
+        return [execute_tool(tc.name, tc.input) for tc in tool_calls]
+
+    def run(tc):
+        _progress.concurrent = True
+        return execute_tool(tc.name, tc.input)
+
+    workers = min(len(tool_calls), MAX_PARALLEL_TOOLS)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run, tool_calls))
 
 
 # =============================================================================
@@ -718,7 +837,6 @@ def agent_loop(messages: list) -> list:
             messages.append({"role": "assistant", "content": response.content})
             return messages
 
-        results = []
         for tc in tool_calls:
             # Special display for different tool types
             if tc.name == "Task":
@@ -728,8 +846,10 @@ def agent_loop(messages: list) -> list:
             else:
                 print(f"\n> {tc.name}")
 
-            output = execute_tool(tc.name, tc.input)
+        outputs = execute_tools(tool_calls)
 
+        results = []
+        for tc, output in zip(tool_calls, outputs):
             # Skill tool shows summary, not full content
             if tc.name == "Skill":
                 print(f"  Skill loaded ({len(output)} chars)")